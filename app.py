@@ -1,5 +1,10 @@
 import io
 import os
+import hashlib
+import hmac
+import json
+import secrets
+import time
 import psycopg2
 from psycopg2 import pool
 import pandas as pd
@@ -121,6 +126,7 @@ DB_PORT = os.getenv("DB_PORT")
 SUPERADMIN_USER = os.getenv("SUPERADMIN_USER")
 SUPERADMIN_ROOM = os.getenv("SUPERADMIN_ROOM")
 SUPERADMIN_PIN= os.getenv("SUPERADMIN_PIN")
+SESSION_SECRET = os.getenv("SESSION_SECRET")
 
 
 # ---- Database Connection Pool ----
@@ -243,6 +249,69 @@ def initialize_tables():
 # Call only once at the start of the app
 initialize_tables()
 
+# ---------------------- PIN HASHING & SESSIONS ----------------------
+PIN_HASH_ALGORITHM = "pbkdf2_sha256"
+# Roughly 35 ms per check on a single core. A PIN is verified once per login and
+# the signed session token is checked in memory afterwards, so the 8 PM rush costs
+# one hash per boarder instead of one per rerun.
+PIN_HASH_ITERATIONS = 100_000
+SESSION_TTL = timedelta(minutes=30)
+
+def hash_pin(pin):
+    """Returns a salted PBKDF2 hash of the PIN in the form stored in `boarders.pin`."""
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", pin.encode(), salt, PIN_HASH_ITERATIONS)
+    return f"{PIN_HASH_ALGORITHM}${PIN_HASH_ITERATIONS}${salt.hex()}${digest.hex()}"
+
+def verify_pin(pin, stored):
+    """Checks a PIN against its stored hash. Legacy plaintext PINs are still accepted."""
+    if not pin or not stored:
+        return False
+    parts = stored.split("$")
+    if len(parts) != 4:
+        return hmac.compare_digest(pin.encode(), stored.encode())
+    algorithm, iterations, salt, digest = parts
+    if algorithm != PIN_HASH_ALGORITHM:
+        return False
+    candidate = hashlib.pbkdf2_hmac("sha256", pin.encode(), bytes.fromhex(salt), int(iterations))
+    return hmac.compare_digest(candidate.hex(), digest)
+
+def upgrade_pin_hash(boarder_id, pin, stored):
+    """Re-hashes a verified PIN stored as plaintext or with an outdated cost."""
+    if not stored.startswith(f"{PIN_HASH_ALGORITHM}${PIN_HASH_ITERATIONS}$"):
+        execute_query("UPDATE boarders SET pin=%s WHERE id=%s", (hash_pin(pin), boarder_id))
+
+@st.cache_resource
+def get_session_secret():
+    """Returns the key used to sign session tokens, falling back to a per-process random key."""
+    return SESSION_SECRET.encode() if SESSION_SECRET else secrets.token_bytes(32)
+
+def sign_session_body(body):
+    return hmac.new(get_session_secret(), body.encode(), hashlib.sha256).hexdigest()
+
+def issue_session_token(scope, subject, role=None):
+    """Creates a signed token for `subject` that expires after SESSION_TTL."""
+    claims = {
+        "scope": scope,
+        "sub": subject,
+        "role": role,
+        "exp": int(time.time() + SESSION_TTL.total_seconds()),
+    }
+    body = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode()
+    return f"{body}.{sign_session_body(body)}"
+
+def read_session_token(token, scope):
+    """Returns the token's claims if it is authentic, unexpired and issued for `scope`, else None."""
+    if not token:
+        return None
+    body, _, signature = token.rpartition(".")
+    if not hmac.compare_digest(signature, sign_session_body(body)):
+        return None
+    claims = json.loads(base64.urlsafe_b64decode(body))
+    if claims["scope"] != scope or claims["exp"] < time.time():
+        return None
+    return claims
+
 # ---------------------- UTILS ----------------------
 def register_user(name, room, username, pin):
     """Registers a new user after validation."""
@@ -257,7 +326,7 @@ def register_user(name, room, username, pin):
     else:
         execute_query(
             "INSERT INTO boarders (name, room_no, username, pin) VALUES (%s,%s,%s,%s)",
-            (name, room, username, pin)
+            (name, room, username, hash_pin(pin))
         )
         st.success("Registered successfully! You can now book your meals.")
 
@@ -271,7 +340,15 @@ def get_all_boarders():
 
 def get_users_in_room(room):
     """Fetches all users in a specific room."""
-    return execute_query("SELECT id, name, pin FROM boarders WHERE room_no=%s", (room,), fetch='all')
+    return execute_query("SELECT id, name FROM boarders WHERE room_no=%s", (room,), fetch='all')
+
+def verify_boarder_pin(user_id, pin):
+    """Verifies a boarder's PIN against the stored hash."""
+    row = execute_query("SELECT pin FROM boarders WHERE id=%s", (user_id,), fetch='one')
+    if row and verify_pin(pin, row[0]):
+        upgrade_pin_hash(user_id, pin, row[0])
+        return True
+    return False
 
 def get_booking_date():
     """
@@ -344,16 +421,19 @@ def book_meal(user_id, lunch, dinner, dinner_choice, meal_date):
 
 def validate_convenor(username, room, pin):
     """Validates convenor credentials, including a hardcoded superadmin."""
-    if username == SUPERADMIN_USER and room == SUPERADMIN_ROOM and pin == SUPERADMIN_PIN:
+    if (username == SUPERADMIN_USER and room == SUPERADMIN_ROOM and SUPERADMIN_PIN
+            and hmac.compare_digest(pin.encode(), SUPERADMIN_PIN.encode())):
         return "superadmin"
     
     row = execute_query(
-        "SELECT is_convenor FROM boarders WHERE username=%s AND room_no=%s AND pin=%s",
-        (username, room, pin),
+        "SELECT id, pin, is_convenor FROM boarders WHERE username=%s AND room_no=%s",
+        (username, room),
         fetch='one'
     )
-    if row and row[0] == 1:
-        return "convenor"
+    if row and verify_pin(pin, row[1]):
+        upgrade_pin_hash(row[0], pin, row[1])
+        if row[2] == 1:
+            return "convenor"
     return None
 
 def to_excel(df):
@@ -472,10 +552,17 @@ elif menu == "Book Meal":
         if room:
             users_in_room = get_users_in_room(room.strip())
             if users_in_room:
-                user_map = {u[1]: (u[0], u[2]) for u in users_in_room} # Map name to (id, pin)
+                user_map = {u[1]: u[0] for u in users_in_room} # Map name to id
                 selected_user_name = st.selectbox("Select Your Name", user_map.keys())
                 
                 if selected_user_name:
+                    user_id = user_map[selected_user_name]
+                    # A verified PIN is remembered as a signed token, so later reruns skip the check
+                    session = read_session_token(st.session_state.get("booking_token"), "boarder")
+                    pin_verified = session is not None and session["sub"] == user_id
+                    if pin_verified and st.sidebar.button("Logout"):
+                        del st.session_state.booking_token
+                        st.rerun()
                     
                     # --- MOVE THESE WIDGETS OUTSIDE THE FORM ---
                     book_lunch = st.checkbox("Lunch", value=False)
@@ -489,13 +576,18 @@ elif menu == "Book Meal":
                     
                     # --- THE FORM STARTS HERE ---
                     with st.form("booking_form"):
-                        entered_pin = st.text_input("Enter your 4-digit PIN to confirm", type="password", max_chars=4)
+                        if pin_verified:
+                            st.caption(f"PIN verified for {selected_user_name}.")
+                        else:
+                            entered_pin = st.text_input("Enter your 4-digit PIN to confirm", type="password", max_chars=4)
                         
                         book_button = st.form_submit_button("Book Meal")
                         
                         if book_button:
-                            user_id, correct_pin = user_map[selected_user_name]
-                            if entered_pin == correct_pin:
+                            if not pin_verified and verify_boarder_pin(user_id, entered_pin):
+                                st.session_state.booking_token = issue_session_token("boarder", user_id)
+                                pin_verified = True
+                            if pin_verified:
                                 book_meal(user_id, book_lunch, book_dinner, dinner_choice, meal_date)
                             else:
                                 st.error("Invalid PIN. Please try again.")
@@ -509,11 +601,13 @@ elif menu == "Book Meal":
 elif menu == "Admin Panel":
     st.header("Admin Panel")
 
-    # FIX: Initialize session state keys for admin role and username
-    if "admin_role" not in st.session_state:
-        st.session_state.admin_role = None
-    if "admin_username" not in st.session_state:
-        st.session_state.admin_username = None
+    # Role and username are re-derived from the signed session token on every rerun
+    session = read_session_token(st.session_state.get("admin_token"), "admin")
+    if session is None and "admin_token" in st.session_state:
+        del st.session_state.admin_token
+        st.warning("Your session has expired. Please log in again.")
+    st.session_state.admin_role = session["role"] if session else None
+    st.session_state.admin_username = session["sub"] if session else None
 
     if st.session_state.admin_role is None:
         with st.form("admin_login"):
@@ -529,9 +623,7 @@ elif menu == "Admin Panel":
             if login_button:
                 role = validate_convenor(username, room, pin)
                 if role:
-                    # FIX: Store both role and username in session state
-                    st.session_state.admin_role = role
-                    st.session_state.admin_username = username
+                    st.session_state.admin_token = issue_session_token("admin", username, role)
                     st.success(f"{role.capitalize()} Access Granted!")
                     st.rerun()
                 else:
@@ -539,8 +631,7 @@ elif menu == "Admin Panel":
     else:
         st.sidebar.success(f"Logged in as: {st.session_state.admin_username} ({st.session_state.admin_role})")
         if st.sidebar.button("Logout"):
-            st.session_state.admin_role = None
-            st.session_state.admin_username = None
+            del st.session_state.admin_token
             st.rerun()
 
     # Superadmin can do everything a convenor can, plus manage convenors.
@@ -636,7 +727,7 @@ elif menu == "Reset PIN":
                     SET pin=%s
                     WHERE username=%s AND room_no=%s
                 """
-                rows = execute_query(query,(new_pin,username,room)) #Incase of UPDATE-PostgreSQL executes the query and internally counts how many rows were affected.
+                rows = execute_query(query,(hash_pin(new_pin),username,room)) #Incase of UPDATE-PostgreSQL executes the query and internally counts how many rows were affected.
                 if rows == 0:
                     st.session_state.reset_result = ("error","No matching boarder found!")
                 else: